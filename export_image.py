@@ -2,32 +2,45 @@
 # -*- coding: utf-8 -*-
 
 import importlib.util
-if importlib.util.find_spec('icalendar') is None:
-    raise ImportError('Install the missing icalendar module using "pip install icalendar".')
 if importlib.util.find_spec('pymupdf') is None:
     raise ImportError('Install the missing pymupdf module using "pip install pymupdf".')
+if importlib.util.find_spec('PIL') is None:
+    raise ImportError('Install the missing Pillow module using "pip install pillow".')
+if importlib.util.find_spec('requests') is None:
+    raise ImportError('Install the missing requests module using "pip install requests".')
+if importlib.util.find_spec('tzdata') is None:
+    raise ImportError('Install the missing tzdata module using "pip install tzdata".')
 
 import argparse
-from datetime import date, datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+import functools
 import glob
-import icalendar # pip install icalendar
 import io
-from operator import itemgetter
+import multiprocessing
+from multiprocessing import shared_memory
 import os.path
 import pathlib
+from PIL import Image # pip install pillow
 import pymupdf # pip install pymupdf
 import re
+import requests # pip install requests
 import subprocess
 import sys
 import tempfile
 import time
 from urllib import request as urlrequest
-from zoneinfo import ZoneInfo
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 DEFAULT_INPUT = "https://sp3eder.github.io/autosesemenyek/"
 TIMEZONE = ZoneInfo("Europe/Budapest")
 CHROMIUM_BROWSER_PATH = r"C:\\Program Files (x86)\\Microsoft\\Edge\\Application\\msedge.exe"
 IMAGE_DPI = 250
+IMAGE_FORMATS = ("jpg", "png")
+JPEG_QUALITY = 85
+PNG_COMPRESS_LEVEL = 1
+DOWNLOAD_WORKERS = 8
+RENDER_WORKERS = 4
 HTML_TEMPLATE = """<!DOCTYPE html>
 <html lang="hu">
 <head>
@@ -144,9 +157,24 @@ HTML_TEMPLATE = """<!DOCTYPE html>
 # The other columns then take the remaining space with the indicated ratios while wrapping.
 # This logic is provided by the table's default auto layout algorithm.
 
+SCRIPT_URL = pathlib.Path(os.path.dirname(os.path.abspath(__file__))).as_uri()
+
+# The template is split at its placeholders once, so that the output is assembled with a single join
+[HTML_HEAD, HTML_TABLE_END, HTML_TAIL] = re.split(
+    '@TABLE_ROWS@|@LEGEND@', HTML_TEMPLATE.replace('@SRC_URL@', SCRIPT_URL))
+
+URL_SCHEMES = ("http://", "https://", "file://")
+LEGEND_RE = re.compile(r'''['\"](?P<title>[^'\"]+)['\"]\s*:\s*{\s*(?:[^\[{]*(?:\[[^\]]*?\])|(?:\{[^\}]*?\})*)*\s*,?\s*['\"]clr['\"]\s*:\s*['\"](?P<color>#(?:[\dA-Fa-f]{3,8}|[a-zA-Z]+))['\"]''')
+CALID_RE = re.compile(r'''{\s*['\"]id['\"]\s*:\s*['\"](?P<calid>[^'\"]+)['\"]\s*,\s*['\"]clr['\"]\s*:\s*['\"](?P<clr>#[0-9A-Fa-f]+)['\"]\s*}''')
+LOCATION_SUFFIX_RE = re.compile(r"(?:[, ]+(?:\d{4}|hungary|magyarország))+$", flags=re.IGNORECASE)
+ICS_TEXT_ESCAPE_RE = re.compile(r"\\[\\;,nN]")
+ICS_TEXT_ESCAPES = { '\\\\': '\\', '\\;': ';', '\\,': ',', '\\n': '\n', '\\N': '\n' }
+ICS_DURATION_RE = re.compile(rb"([+-]?)P(?:(\d+)W|(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?)")
+ICS_ZONES = {}
+
 def load_html(file_path):
     """Load Autos Esemenyek index.html file from a URL or local file."""
-    if re.match(r"^(https?|file)://", file_path):
+    if file_path.startswith(URL_SCHEMES):
         with urlrequest.urlopen(file_path) as response:
             return response.read().decode("utf-8")
 
@@ -154,42 +182,146 @@ def load_html(file_path):
         return file.read()
 
 def parse_filter_legend(html):
-    pattern = re.compile(r'''['\"](?P<title>[^'\"]+)['\"]\s*:\s*{\s*(?:[^\[{]*(?:\[[^\]]*?\])|(?:\{[^\}]*?\})*)*\s*,?\s*['\"]clr['\"]\s*:\s*['\"](?P<color>#(?:[\dA-Fa-f]{3,8}|[a-zA-Z]+))['\"]''')
-    return {m.group('title'): m.group('color') for m in pattern.finditer(html)}
+    return {m.group('title'): m.group('color') for m in LEGEND_RE.finditer(html)}
 
 def parse_calids_from_html(html):
     """Extract calendar IDs and colors from the autos esemenyek index.html."""
-    pattern = re.compile(r'''{\s*['\"]id['\"]\s*:\s*['\"](?P<calid>[^'\"]+)['\"]\s*,\s*['\"]clr['\"]\s*:\s*['\"](?P<clr>#[0-9A-Fa-f]+)['\"]\s*}''')
-    return (m.groupdict() for m in pattern.finditer(html))
+    # Only start the regex search at the first calendar ID key, skipping the bulk of the page
+    starts = [pos for pos in (html.find("'id'"), html.find('"id"')) if pos >= 0]
+    if not starts:
+        return iter(())
+    start = max(html.rfind('{', 0, min(starts)), 0)
+    return (m.groupdict() for m in CALID_RE.finditer(html, start))
 
 def download_calendars(caldata):
-    """Download iCal data from Google Calendar public URLs."""
-    for [calid, clr] in (itemgetter('calid', 'clr')(cal) for cal in caldata):
-        with urlrequest.urlopen(f'https://calendar.google.com/calendar/ical/{calid}/public/basic.ics') as response:
-            assert response.status == 200, f"Failed to download calendar {calid}: HTTP {response.status}"
-            ics = response.read().decode('utf-8')
-            yield { 'ics': ics, 'clr': clr }
+    """Download iCal data from Google Calendar public URLs, in parallel over a pooled session.
+
+    The calendar list is iterated twice, so it must not be a one-shot iterator.
+    """
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as pool:
+        def fetch(cal):
+            calid = cal['calid']
+            response = session.get(f'https://calendar.google.com/calendar/ical/{calid}/public/basic.ics')
+            assert response.status_code == 200, f"Failed to download calendar {calid}: HTTP {response.status_code}"
+            return response.content
+
+        # map() keeps the results in the order of the calendars
+        for [ics, cal] in zip(pool.map(fetch, caldata), caldata):
+            yield { 'ics': ics, 'clr': cal['clr'] }
+
+def unfold_ics_lines(ics):
+    """Split raw iCal data into content lines, joining the folded continuation lines."""
+    lines = []
+    for line in ics.split(b'\n'):
+        line = line.removesuffix(b'\r')
+        if line.startswith((b' ', b'\t')):
+            if lines:
+                lines[-1] += line[1:]
+        elif line:
+            lines.append(line)
+    return lines
+
+def split_ics_line(line):
+    """Split an iCal content line into its upper-case name, its decoded parameters and its raw value."""
+    colon = line.find(b':')
+    # Quoted parameter values may contain colons, skip those
+    while colon >= 0 and line.count(b'"', 0, colon) % 2:
+        colon = line.find(b':', colon + 1)
+    if colon < 0:
+        return [line.upper(), {}, b'']
+
+    [name, *params] = line[:colon].split(b';')
+    params = dict(param.decode('utf-8').partition('=')[::2] for param in params)
+    return [name.upper(), {k.upper(): v.strip('"') for k, v in params.items()}, line[colon + 1:]]
+
+def parse_ics_text(value):
+    """Decode and unescape an iCal TEXT value."""
+    value = value.decode('utf-8')
+    return ICS_TEXT_ESCAPE_RE.sub(lambda m: ICS_TEXT_ESCAPES[m.group(0)], value) if '\\' in value else value
+
+def parse_ics_datetime(value, params):
+    """Parse a raw iCal DATE or DATE-TIME value, honoring its TZID parameter."""
+    [y, mo, d] = [int(value[0:4]), int(value[4:6]), int(value[6:8])]
+    if params.get('VALUE') == 'DATE' or len(value) == 8:
+        return date(y, mo, d)
+
+    [h, mi, sec] = [int(value[9:11]), int(value[11:13]), int(value[13:15])]
+    tzid = params.get('TZID')
+    if value.endswith(b'Z'):
+        zone = timezone.utc
+    elif tzid is None:
+        # Floating time, interpreted in the system time zone
+        zone = None
+    else:
+        if tzid not in ICS_ZONES:
+            try:
+                ICS_ZONES[tzid] = ZoneInfo(tzid)
+            except (ZoneInfoNotFoundError, ValueError):
+                # Non-IANA time zone names are assumed to be the local time zone
+                ICS_ZONES[tzid] = TIMEZONE
+        zone = ICS_ZONES[tzid]
+
+    # Convert to the local time zone once here, so that the later conversions are no-ops
+    dt = datetime(y, mo, d, h, mi, sec, tzinfo=zone)
+    return dt if zone is TIMEZONE else dt.astimezone(TIMEZONE)
+
+def parse_ics_duration(value):
+    """Parse a raw iCal DURATION value."""
+    m = ICS_DURATION_RE.fullmatch(value.strip())
+    if m is None:
+        raise ValueError(f"Unsupported iCal duration: {value.decode('utf-8', 'replace')}")
+    [sign, weeks, days, hours, minutes, seconds] = m.groups()
+    duration = timedelta(
+        weeks=int(weeks or 0), days=int(days or 0),
+        hours=int(hours or 0), minutes=int(minutes or 0), seconds=int(seconds or 0))
+    return -duration if sign == b'-' else duration
 
 def get_calendar_events(caldata):
-    """Parse iCal data and extract needed event information."""
-    for [ics, clr] in (itemgetter('ics', 'clr')(cal) for cal in caldata):
-        cal = icalendar.Calendar.from_ical(ics)
-        for component in cal.walk():
-            if component.name == "VEVENT":
-                yield {
-                    'summary': component.get('summary'),
-                    'location': component.get('location'),
-                    'start': component.start,
-                    'end': component.end,
-                    'clr': clr
-                }
+    """Parse iCal data and extract needed event information.
+
+    Only the properties needed for the output are parsed, with a simple line scan over the raw
+    bytes. Properties of components nested in the events (e.g. alarms) are ignored.
+    """
+    for cal in caldata:
+        ics = cal['ics']
+        clr = cal['clr']
+        depth = 0
+        for line in unfold_ics_lines(ics):
+            [name, params, value] = split_ics_line(line)
+            if name == b'BEGIN':
+                if depth or value.upper() == b'VEVENT':
+                    depth += 1
+                    if depth == 1:
+                        props = {}
+            elif name == b'END':
+                if depth:
+                    depth -= 1
+                    if depth == 0 and b'DTSTART' in props:
+                        start = parse_ics_datetime(*props[b'DTSTART'])
+                        has_time = isinstance(start, datetime)
+                        if b'DTEND' in props:
+                            end = parse_ics_datetime(*props[b'DTEND'])
+                            if isinstance(end, datetime) != has_time:
+                                raise ValueError("Start and end times must both be date or datetime")
+                        elif b'DURATION' in props:
+                            end = start + parse_ics_duration(props[b'DURATION'][0])
+                        else:
+                            # Without an end, all-day events last one day and timed events are instantaneous
+                            end = start if has_time else start + timedelta(days=1)
+                        yield {
+                            'summary': parse_ics_text(props[b'SUMMARY'][0]) if b'SUMMARY' in props else None,
+                            'location': parse_ics_text(props[b'LOCATION'][0]) if b'LOCATION' in props else None,
+                            'start': start,
+                            'end': end,
+                            'kind': 'dt' if has_time else 'd',
+                            'clr': clr
+                        }
+            elif depth == 1 and name in (b'SUMMARY', b'LOCATION', b'DTSTART', b'DTEND', b'DURATION'):
+                props[name] = (value, params)
 
 def get_time(dt):
     """Convert date or datetime to datetime, for comparisons."""
-    if type(dt) == datetime:
-        return dt
-    else:
-        return datetime(dt.year, dt.month, dt.day, tzinfo=TIMEZONE)
+    return dt if isinstance(dt, datetime) else datetime(dt.year, dt.month, dt.day, tzinfo=TIMEZONE)
 
 def filter_events(evtdata, dt_start=None, dt_end=None):
   """Filter events to those overlapping the requested date range."""
@@ -203,6 +335,57 @@ def filter_events(evtdata, dt_start=None, dt_end=None):
     ):
         yield evt
 
+def fmt_date(dt):
+    """Format the date of a date or datetime as yyyy.mm.dd."""
+    return f"{dt.year}.&#8202;{dt.month:02}.&#8202;{dt.day:02}."
+
+@functools.lru_cache(maxsize=4096)
+def fmt_date_range(start, end):
+    """Format the start-end dates of an all-day event as a string.
+
+    The results are cached, as the same time ranges recur across the calendars.
+    """
+    mdash = '\u2014'
+    # Dates are an open ended interval, so show the day before as the end date
+    end = end - timedelta(days=1)
+    fmt_dt_start = fmt_date(start)
+
+    if start == end:
+        # Single date: yyyy.mm.dd.
+        return fmt_dt_start
+    elif start.year == end.year and start.month == end.month:
+        # Same month: yyyy.mm.dd-dd.
+        return f"{fmt_dt_start.removesuffix('.')}{mdash}{end.day:02}."
+    else:
+        # Different months or years: yyyy.mm.dd.\nyyyy.mm.dd.
+        return f"{fmt_dt_start} {mdash}<br/>{fmt_date(end)}"
+
+@functools.lru_cache(maxsize=4096)
+def fmt_datetime_range(start, end):
+    """Format the start-end times of a timed event as a string.
+
+    The results are cached, as the same time ranges recur across the calendars.
+    """
+    mdash = '\u2014'
+    # Parsed events are already in the local time zone, so the conversion is usually skipped
+    if start.tzinfo is not TIMEZONE:
+        start = start.astimezone(TIMEZONE)
+    if end.tzinfo is not TIMEZONE:
+        end = end.astimezone(TIMEZONE)
+    fmt_dt_start = fmt_date(start)
+
+    if start == end:
+        # Single point in time: yyyy.mm.dd.
+        return fmt_dt_start
+
+    [fmt_t_start, fmt_t_end] = [f"{t.hour:02}:{t.minute:02}" for t in (start, end)]
+    if start.date() == end.date():
+        # Same day: yyyy.mm.dd. hh:mm-hh:mm
+        return f"{fmt_dt_start} {fmt_t_start}-{fmt_t_end}"
+    else:
+        # Different days: yyyy.mm.dd. hh:mm\nyyyy.mm.dd. hh:mm
+        return f"{fmt_dt_start} {fmt_t_start} {mdash}<br/>{fmt_date(end)} {fmt_t_end}"
+
 def format_output_html(events, legenddata):
     """Convert event and legend data to HTML and generate the final HTML."""
     # Format the legend
@@ -211,61 +394,28 @@ def format_output_html(events, legenddata):
         for title, color in legenddata.items()
     )
 
-    def fmt_dt_range(start, end):
-        """Implements complex logic for formatting the event start-end time as a string."""
-        [thinsp, mdash] = ['&#8202;', '\u2014']
-
-        [start_has_time, end_has_time] = [isinstance(dt, datetime) for dt in (start, end)]
-        start = start.astimezone(TIMEZONE) if start_has_time else start
-        # Dates are an open ended interval, so show the day before as the end date
-        end = end.astimezone(TIMEZONE) if end_has_time else end - timedelta(days=1)
-        [fmt_dt_start, fmt_dt_end] = [dt.strftime(f"%Y.{thinsp}%m.{thinsp}%d.") for dt in (start, end)]
-
-        if start_has_time != end_has_time:
-            raise ValueError("Start and end times must both be date or datetime")
-        elif start == end:
-            # Single date: yyyy.mm.dd.
-            return fmt_dt_start
-        elif not start_has_time:
-            if start.year == end.year and start.month == end.month:
-                # Date-only same-month: yyyy.mm.dd-dd.
-                return f"{fmt_dt_start.removesuffix('.')}{mdash}{end.day:02}."
-            else:
-                # Different months or years: yyyy.mm.dd.\nyyyy.mm.dd.
-                return f"{fmt_dt_start} {mdash}<br/>{fmt_dt_end}"
-        else:
-            [fmt_t_start, fmt_t_end] = [t.strftime("%H:%M") for t in (start, end)]
-            if start.date() == end.date():
-                # Same day with time: yyyy.mm.dd. hh:mm-hh:mm
-                return f"{fmt_dt_start} {fmt_t_start}-{fmt_t_end}"
-            else:
-                # Different days with time: yyyy.mm.dd. hh:mm\nyyyy.mm.dd. hh:mm
-                return f"{fmt_dt_start} {fmt_t_start} {mdash}<br/>{fmt_dt_end} {fmt_t_end}"
-
     # Format the event table
     rows = []
     for evt in events:
         summary = evt.get('summary', '')
         location = evt.get('location', '') or ''
-        location = re.sub(
-            r"(?:[, ]+(?:\d{4}|hungary|magyarország))+$", "", location, flags=re.IGNORECASE
-        )
+        location = LOCATION_SUFFIX_RE.sub("", location)
 
+        fmt_range = fmt_datetime_range if evt['kind'] == 'dt' else fmt_date_range
         rows.append(
             f'<tr style="color: {evt['clr']};">'
-            f'<td>{fmt_dt_range(evt['start'], evt['end'])}</td>'
-            f'<td>{summary}</td><td>{location}</td></tr>'
+            f'<td>{fmt_range(evt['start'], evt['end'])}</td>'
+            f'<td>{summary}</td><td>{location}</td></tr>\n'
         )
 
-    script_url = pathlib.Path(os.path.dirname(os.path.abspath(__file__))).as_uri()
-
-    tokens = { '@TABLE_ROWS@': '\n'.join(rows), '@LEGEND@': legend, '@SRC_URL@': script_url }
-    return re.sub('|'.join(tokens.keys()), lambda m: tokens[m.group(0)], HTML_TEMPLATE)
+    return ''.join((HTML_HEAD, *rows, HTML_TABLE_END, legend, HTML_TAIL))
 
 def write_pdf_from_html(html, keep_temp):
     """Write HTML to a PDF file using headless Edge browser (Windows only)."""
     output_path = tempfile.mktemp(prefix="event_", suffix=".pdf")
 
+    # The HTML is passed to the browser as a file. A data: URL would not fit into the 32767 character
+    # Windows command line limit, and its page would not be allowed to load the file:// background image.
     with tempfile.NamedTemporaryFile(
         mode='w+', encoding='utf-8', prefix='event_', suffix='.html',
         delete=not keep_temp, delete_on_close=False
@@ -279,6 +429,10 @@ def write_pdf_from_html(html, keep_temp):
                 CHROMIUM_BROWSER_PATH,
                 '--headless',
                 '--disable-gpu',
+                # Skip the profile setup steps which only slow down the browser startup
+                '--no-first-run',
+                '--no-default-browser-check',
+                '--disable-extensions',
                 '--run-all-compositor-stages-before-draw',
                 '--no-pdf-header-footer',
                 '--print-to-pdf-no-header',
@@ -286,12 +440,11 @@ def write_pdf_from_html(html, keep_temp):
                 html_path
             ], check=True, stdout=sys.stdout, stderr=sys.stderr, text=True)
 
-            timeout = 10
-            start_time = time.time()
-            while not os.path.exists(output_path):
-                if time.time() - start_time > timeout:
-                    print(f'PDF file was not created within {timeout} seconds: {output_path}', file=sys.stderr)
-                time.sleep(0.1)
+            # The browser has exited, but the file may appear with a small delay
+            for delay in (0.01, 0.02, 0.04):
+                if os.path.exists(output_path):
+                    break
+                time.sleep(delay)
 
         print_html()
         if not os.path.exists(output_path):
@@ -309,18 +462,67 @@ def write_pdf_from_html(html, keep_temp):
 
     return output_path
     
-def export_to_png(output_path, pdf_path, keep_temp):
-    """Convert PDF pages to PNG images using PyMuPDF (if available)."""
+# The PDF document opened by the initializer of a render worker process
+_render_doc = None
+
+def _init_render_worker(shm_name, pdf_size):
+    """Open the PDF shared by the parent process once per worker process."""
+    global _render_doc
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        pdf_data = bytes(shm.buf[:pdf_size])
+    finally:
+        shm.close()
+    _render_doc = pymupdf.open(stream=pdf_data, filetype="pdf")
+
+def _render_page(args):
+    """Render a single page of the shared PDF to an image file. Runs in a worker process."""
+    [i, output_path, image_format] = args
+    render_page(_render_doc, i, output_path, image_format)
+
+def render_page(doc, i, output_path, image_format):
+    """Render a page of a PDF document to a JPEG or PNG image file."""
+    pix = doc[i].get_pixmap(dpi=IMAGE_DPI, alpha=False)
+    if image_format == "jpg":
+        with open(f"{output_path}_{i+1}.jpg", "wb") as file:
+            file.write(pix.tobytes("jpg", jpg_quality=JPEG_QUALITY))
+    else:
+        # Pillow with a low compression level encodes much faster than MuPDF's PNG writer
+        image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+        image.save(f"{output_path}_{i+1}.png", format="PNG", optimize=False, compress_level=PNG_COMPRESS_LEVEL)
+
+def export_images(output_path, pdf_path, image_format, keep_temp):
+    """Convert PDF pages to JPEG or PNG images using PyMuPDF, rendering multiple pages in parallel."""
     if not os.path.isabs(output_path):
         output_path = os.path.join(os.getcwd(), output_path)
 
-    for file in glob.glob(f"{output_path}_*.png"):
-        os.remove(file)
-
-    with pymupdf.open(pdf_path) as doc:
-        for i, page in enumerate(doc):
-            pix = page.get_pixmap(dpi=IMAGE_DPI)
-            pix.save(f"{output_path}_{i+1}.png")
+    # Remove the images of earlier runs in any format, so that no stale pages remain
+    for ext in IMAGE_FORMATS:
+        for file in glob.glob(f"{output_path}_*.{ext}"):
+            os.remove(file)
+
+    # The PDF is read once; multiple pages are shared with the workers through memory
+    with open(pdf_path, "rb") as file:
+        pdf_data = file.read()
+    with pymupdf.open(stream=pdf_data, filetype="pdf") as doc:
+        page_count = doc.page_count
+        if page_count <= 1:
+            # Starting a worker process costs more than rendering a single page
+            for i in range(page_count):
+                render_page(doc, i, output_path, image_format)
+
+    if page_count > 1:
+        shm = shared_memory.SharedMemory(create=True, size=len(pdf_data))
+        try:
+            shm.buf[:len(pdf_data)] = pdf_data
+            with multiprocessing.Pool(
+                min(os.cpu_count() or 1, RENDER_WORKERS, page_count),
+                initializer=_init_render_worker, initargs=(shm.name, len(pdf_data))
+            ) as pool:
+                pool.map(_render_page, [(i, output_path, image_format) for i in range(page_count)])
+        finally:
+            shm.close()
+            shm.unlink()
 
     try:
         if (not keep_temp):
@@ -347,6 +549,7 @@ def main():
     parser.add_argument("--output", "-o", default="events", help="Output without extension. Default: events")
     parser.add_argument("--dt-start", "-s", default=datetime.now(TIMEZONE).date(), type=parse_iso_date, help="Collect events from this ISO date (YYYY-MM-DD). Default: today.")
     parser.add_argument("--dt-end", "-e", type=parse_iso_date, help="Collect events through this ISO date (YYYY-MM-DD).")
+    parser.add_argument("--image-format", "-f", choices=IMAGE_FORMATS, default="jpg", help="Format of the exported images. Default: jpg")
     parser.add_argument("--keep-temp", type=bool, default=False, help="Keep temporary files. Default: False")
     args = parser.parse_args()
 
@@ -356,17 +559,17 @@ def main():
     print("Loading HTML...")
     html = load_html(args.html_file)
     legenddata = parse_filter_legend(html)
-    caldata = parse_calids_from_html(html)
-    print("Loaded some calendars. Processing...")
-    caldata = download_calendars(caldata)
+    caldata = list(parse_calids_from_html(html))
+    print(f"Loaded {len(caldata)} calendars. Processing...")
+    caldata = list(download_calendars(caldata))
     evtdata = get_calendar_events(caldata)
     evtdata = filter_events(evtdata, dt_start=args.dt_start, dt_end=args.dt_end)
     events = sorted(evtdata, key=lambda evt: (get_time(evt["start"]), evt["summary"]))
     print(f"Found {len(events)} matching events. Generating PDF...")
     html = format_output_html(events, legenddata)
     pdf_file = write_pdf_from_html(html, keep_temp=args.keep_temp)
-    print("PDF file is created. Converting to PNG images...")
-    out_dir = export_to_png(args.output, pdf_file, keep_temp=args.keep_temp)
+    print(f"PDF file is created. Converting to {args.image_format.upper()} images...")
+    out_dir = export_images(args.output, pdf_file, args.image_format, keep_temp=args.keep_temp)
     os.startfile(out_dir)
 
 if __name__=="__main__":